@@ -1,3 +1,4 @@
-from .plotting import hmetrics_plot
+from .plotting import hmetrics_plot, plot_style
+from .stats import run_pairwise_tests, clear_pairwise_cache
 
-__all__ = ["hmetrics_plot"]
+__all__ = ["hmetrics_plot", "plot_style", "run_pairwise_tests", "clear_pairwise_cache"]
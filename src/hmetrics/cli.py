@@ -1,8 +1,18 @@
 from __future__ import annotations
 import argparse
+import os
+
 import pandas as pd
-import matplotlib.pyplot as plt
-from .plotting import hmetrics_plot
+
+_VECTOR_EXTS = (".pdf", ".eps", ".svg")
+
+def _save(fig, ax, out: str) -> None:
+    if out.lower().endswith(_VECTOR_EXTS):
+        # vector output: keep point clouds and violin bodies as images
+        for c in ax.collections:
+            if not c.get_rasterized():
+                c.set_rasterized(True)
+    fig.savefig(out, dpi=300, bbox_inches="tight")
 
 def main():
     p = argparse.ArgumentParser(
@@ -10,29 +20,68 @@ def main():
     )
     p.add_argument("--csv", required=True, help="Path to CSV with tidy data")
     p.add_argument("--group", required=True, help="Categorical column name")
-    p.add_argument("--value", required=True, help="Numeric column name")
+    p.add_argument("--value", required=True, nargs="+",
+                   help="Numeric column name; several names plot one figure each")
     p.add_argument("--kind", default="box", choices=["box","violin","point"])
     p.add_argument("--nonparametric", action="store_true", help="Use Mann–Whitney instead of Welch")
     p.add_argument("--padjust", default="holm")
     p.add_argument("--alpha", type=float, default=0.05)
+    p.add_argument("--n-jobs", type=int, default=1, help="Processes for pairwise tests (-1 = all CPUs)")
     p.add_argument("--only-sig", action="store_true", help="Annotate only significant pairs")
     p.add_argument("--title", default=None)
     p.add_argument("--ylabel", default=None)
-    p.add_argument("--out", default=None, help="Save figure to this path (e.g., out.png)")
+    p.add_argument("--out", default=None,
+                   help="Save figure to this path (e.g., out.png); with several --value "
+                        "columns, each is saved as <stem>_<value><ext>")
+    p.add_argument("--verbose", action="store_true", help="Report CSV engine and column dtypes")
     args = p.parse_args()
 
-    df = pd.read_csv(args.csv)
-    fig, ax = hmetrics_plot(
-        df=df, group=args.group, value=args.value,
+    # deferred so that --help and argument errors return immediately
+    import matplotlib.pyplot as plt
+    from .plotting import hmetrics_plot, plot_style
+
+    # only the plotted columns are parsed; Arrow's reader when available
+    read_kw = dict(usecols=[args.group, *args.value],
+                   dtype={v: "float64" for v in args.value})
+    try:
+        df = pd.read_csv(args.csv, engine="pyarrow", **read_kw)
+        engine = "pyarrow"
+    except (ImportError, ValueError):
+        # pyarrow missing, or a pandas too old for engine="pyarrow"
+        df = pd.read_csv(args.csv, **read_kw)
+        engine = "c"
+    if args.verbose:
+        print(f"read {len(df)} rows from {args.csv} (engine={engine})")
+        print(df.dtypes.to_string())
+
+    plot_kw = dict(
+        df=df, group=args.group,
         plot_kind=args.kind,
         nonparametric=args.nonparametric,
         padjust=args.padjust,
         alpha=args.alpha,
         show_only_significant=args.only_sig,
+        n_jobs=args.n_jobs,
         title=args.title,
         ylabel=args.ylabel,
     )
-    if args.out:
-        fig.savefig(args.out, dpi=300, bbox_inches="tight")
+    if len(args.value) == 1:
+        fig, ax = hmetrics_plot(value=args.value[0], **plot_kw)
+        if args.out:
+            _save(fig, ax, args.out)
+        else:
+            plt.show()
+    elif args.out:
+        # batch mode: one figure, cleared between metrics, instead of a
+        # fresh figure (and font/renderer setup) per value column
+        stem, ext = os.path.splitext(args.out)
+        with plot_style():
+            fig, ax = plt.subplots(figsize=(6, 5), layout="constrained")
+            for v in args.value:
+                hmetrics_plot(value=v, ax=ax, **plot_kw)
+                _save(fig, ax, f"{stem}_{v}{ext}")
+                ax.clear()
     else:
+        for v in args.value:
+            hmetrics_plot(value=v, **plot_kw)
         plt.show()
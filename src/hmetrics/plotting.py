@@ -1,19 +1,52 @@
 from __future__ import annotations
+import contextlib
+import importlib.util
 import itertools as it
-from typing import Iterable, Optional, Tuple
+import warnings
+from typing import TYPE_CHECKING, Iterable, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import pingouin as pg
 
-try:
-    from statannotations.Annotator import Annotator
-    _HAS_ANNOT = True
-except Exception:
-    # Graceful degrade if statannotations is missing
-    _HAS_ANNOT = False
+from .stats import run_pairwise_tests
+
+if TYPE_CHECKING:
+    import matplotlib.pyplot as plt
+
+# matplotlib, seaborn and statannotations are imported on first use so that
+# `import hmetrics` and the CLI's --help stay fast
+
+@contextlib.contextmanager
+def plot_style():
+    """
+    Context manager applying the seaborn style, context and palette that
+    `hmetrics_plot` draws in.
+
+    Style is applied when axes are created (and cleared), so create any
+    axes passed as ``ax=`` inside this block to match figures that
+    `hmetrics_plot` creates itself.
+    """
+    import seaborn as sns
+
+    with sns.axes_style("whitegrid"), sns.plotting_context("talk"), sns.color_palette("deep"):
+        yield
+
+def _load_annotator():
+    """Return statannotations' Annotator class, or None if unavailable."""
+    try:
+        from statannotations.Annotator import Annotator
+    except Exception:
+        # Graceful degrade if statannotations is missing
+        return None
+    return Annotator
+
+SWARM_MAX = 2000  # swarmplot placement is O(N^2)
+STRIP_JITTER = 0.28  # half-width of strip jitter, in category units (seaborn's jlim)
+DATASHADER_MIN = 20000  # backend='auto' rasterizes strip points above this N
+DATASHADER_DPI = 300    # resolution the datashader canvas is rendered at
+
+# (upper bound, label) pairs; p <= bound gets the label
+PVALUE_THRESHOLDS = [(1e-4, "****"), (1e-3, "***"), (1e-2, "**"), (5e-2, "*"), (1, "ns")]
 
 def hmetrics_plot(
     df: pd.DataFrame,
@@ -32,7 +65,13 @@ def hmetrics_plot(
     figsize: Tuple[float, float] = (6, 5),
     title: Optional[str] = None,
     ylabel: Optional[str] = None,
-    ax: Optional[plt.Axes] = None          # allow external axes
+    ax: Optional[plt.Axes] = None,         # allow external axes
+    n_jobs: int = 1,                       # processes for pairwise tests
+    swarm_max: int = SWARM_MAX,            # above this many points, swarm -> strip
+    rasterize_points: bool = True,         # raster point overlays in vector output
+    fast: bool = False,                    # box: matplotlib fast path, no seaborn
+    use_annotator: bool = False,           # draw stars with statannotations instead
+    backend: str = "auto",                 # strip points: 'auto','matplotlib','datashader'
 ):
     """
     Draw a group-wise statistical plot with pairwise tests and significance annotations.
@@ -73,132 +112,345 @@ def hmetrics_plot(
         Y-axis label; default to `value`.
     ax : matplotlib.axes.Axes | None
         Existing axes to draw on.
+    n_jobs : int
+        Processes used for the pairwise tests; see `run_pairwise_tests`.
+    swarm_max : int
+        Largest number of points drawn as a swarm; beyond it 'swarm' falls
+        back to a jittered stripplot with a warning.
+    rasterize_points : bool
+        Rasterize the swarm/strip overlay so PDF/SVG/EPS output stays small;
+        boxes, lines and text remain vector.
+    fast : bool
+        For plot_kind='box', partition the data once and draw with
+        ``ax.boxplot``/``ax.scatter`` instead of seaborn. Points are always
+        drawn as a (seeded) jittered strip. Ignored for other kinds.
+    use_annotator : bool
+        Draw significance bars with statannotations' Annotator (skipped if it
+        is not installed) instead of the built-in ``ax.plot``/``ax.text``
+        brackets.
+    backend : {'auto','matplotlib','datashader'}
+        Renderer for strip points on box/violin plots. 'datashader' shades
+        the points into one image (O(pixels) instead of O(points));
+        'auto' does so above DATASHADER_MIN points when datashader is
+        installed, and uses seaborn otherwise. The image is rendered at
+        DATASHADER_DPI for the axes' size at draw time and resampled to the
+        final layout and output resolution.
 
     Returns
     -------
     (fig, ax)
     """
-    plt.rcdefaults()
-    
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    if backend not in ("auto", "matplotlib", "datashader"):
+        raise ValueError("backend must be 'auto', 'matplotlib', or 'datashader'.")
+
     # ---- order categories on x ----
     if order is None:
         order = sorted(df[group].dropna().unique().tolist())
-    idx = {lvl: i for i, lvl in enumerate(order)}
+    order = list(order)
+    # fixed categorical dtype: seaborn groups on codes and follows this order;
+    # levels outside order are masked first (pandas deprecates casting them)
+    grp = df[group].where(df[group].isin(order))
+    df = df.assign(**{group: pd.Categorical(grp, categories=order, ordered=True)})
 
     # ---- pairwise tests with multiple-testing correction ----
-    tests = pg.pairwise_tests(
-        data=df, dv=value, between=group,
-        parametric=not nonparametric,
-        padjust=padjust, alternative="two-sided"
-    )
-    # keep only requested levels
-    tests = tests[tests["A"].isin(order) & tests["B"].isin(order)].copy()
+    # skipped when there is nothing to compare or nothing would be annotated
+    Annotator = _load_annotator() if use_annotator else None
+    if len(order) < 2 or (use_annotator and Annotator is None):
+        pairs, pvals = [], []
+    else:
+        tests = run_pairwise_tests(
+            df, group, value, order=order,
+            nonparametric=nonparametric, padjust=padjust, n_jobs=n_jobs
+        )
+        pairs, pvals = _select_pairs(tests, order, alpha, show_only_significant)
 
-    # normalize pairs so (A,B) is always left<right by order
-    tests["pair"] = tests.apply(
-        lambda r: (r.A, r.B) if idx[r.A] < idx[r.B] else (r.B, r.A), axis=1
-    )
+    # seaborn style scoped to this plot; global rcParams are left untouched
+    with plot_style():
+        # ---- axes / figure ----
+        if ax is None:
+            # constrained layout is solved at draw time; no tight_layout pass
+            fig, ax = plt.subplots(figsize=figsize, layout="constrained")
+        else:
+            fig = ax.figure
 
-    # column name differences across Pingouin versions
-    if "pval-corr" in tests.columns:
-        pcol = "pval-corr"
-    elif "p-corr" in tests.columns:
-        pcol = "p-corr"
-    elif "pval-unc" in tests.columns:
-        pcol = "pval-unc"
-    else:
-        pcol = "p-unc"
+        # ---- plotting ----
+        kind = str(plot_kind).lower()
+        # points actually drawn: group within order (else NaN after the cast) and value present
+        n_points = int((df[group].notna() & df[value].notna()).sum())
+        if fast and kind == "box" and show_points == "swarm":
+            show_points = "strip"  # the fast path draws swarms as a jittered strip
+        elif show_points == "swarm" and kind in ("box", "violin") and n_points > swarm_max:
+            # beeswarm layout is quadratic in N; jittered strip is linear
+            warnings.warn(
+                f"{n_points} points exceed swarm_max={swarm_max}; "
+                "drawing a stripplot instead of a swarmplot.",
+                stacklevel=2,
+            )
+            show_points = "strip"
+        ds_points = (show_points == "strip" and kind in ("box", "violin")
+                     and _use_datashader(backend, n_points))
+        if kind == "box" and fast:
+            showf = (show_points is None)  # hide fliers if overlaying points
+            ax = _fast_boxplot(
+                ax, _split_by_group(df, group, value, len(order)), order,
+                show_points=None if ds_points else show_points, showfliers=showf,
+                rasterize_points=rasterize_points,
+            )
 
-    all_pairs = list(it.combinations(order, 2))
-    p_lookup  = tests.set_index("pair")[pcol].to_dict()
-    if show_only_significant:
-        pairs = [p for p in all_pairs if p_lookup.get(p, 1.0) < alpha]
-    else:
-        pairs = all_pairs
-    pvals = [p_lookup.get(p, np.nan) for p in pairs]
-
-    # ---- axes / figure ----
-    sns.set(style="whitegrid", context="talk")
-    created_ax = False
-    if ax is None:
-        fig, ax = plt.subplots(figsize=figsize)
-        created_ax = True
-    else:
-        fig = ax.figure
-
-    # ---- plotting ----
-    kind = str(plot_kind).lower()
-    if kind == "box":
-        showf = (show_points is None)  # hide fliers if overlaying points
-        sns.boxplot(
-            data=df, x=group, y=value, order=order,
-            width=0.5, showfliers=showf,
-            boxprops=dict(linewidth=2, alpha=0.9),
-            whiskerprops=dict(linewidth=2), capprops=dict(linewidth=2),
-            medianprops=dict(linewidth=2.2, color="black"),
-            ax=ax, zorder=1
-        )
-        if show_points == "swarm":
-            sns.swarmplot(
-                data=df, x=group, y=value, order=order,
-                color="black", size=3.5, linewidth=0, zorder=2, ax=ax
+        elif kind == "box":
+            showf = (show_points is None)  # hide fliers if overlaying points
+            sns.boxplot(
+                data=df, x=group, y=value,
+                width=0.5, showfliers=showf,
+                boxprops=dict(linewidth=2, alpha=0.9),
+                whiskerprops=dict(linewidth=2), capprops=dict(linewidth=2),
+                medianprops=dict(linewidth=2.2, color="black"),
+                ax=ax, zorder=1
             )
-        elif show_points == "strip":
-            sns.stripplot(
-                data=df, x=group, y=value, order=order,
-                color="black", size=3.5, jitter=0.28, alpha=0.85,
-                zorder=2, ax=ax
+            if show_points == "swarm":
+                sns.swarmplot(
+                    data=df, x=group, y=value,
+                    color="black", size=3.5, linewidth=0, zorder=2,
+                    rasterized=rasterize_points, ax=ax
+                )
+            elif show_points == "strip" and not ds_points:
+                sns.stripplot(
+                    data=df, x=group, y=value,
+                    color="black", size=3.5, jitter=STRIP_JITTER, alpha=0.85,
+                    zorder=2, rasterized=rasterize_points, ax=ax
+                )
+
+        elif kind == "violin":
+            sns.violinplot(
+                data=df, x=group, y=value,
+                inner="quartile", cut=0, linewidth=1.5,
+                ax=ax, zorder=1
             )
+            if show_points == "swarm":
+                sns.swarmplot(
+                    data=df, x=group, y=value,
+                    color="black", size=3.5, linewidth=0, zorder=2,
+                    rasterized=rasterize_points, ax=ax
+                )
+            elif show_points == "strip" and not ds_points:
+                sns.stripplot(
+                    data=df, x=group, y=value,
+                    color="black", size=3.5, jitter=STRIP_JITTER, alpha=0.85,
+                    zorder=2, rasterized=rasterize_points, ax=ax
+                )
 
-    elif kind == "violin":
-        sns.violinplot(
-            data=df, x=group, y=value, order=order,
-            inner="quartile", cut=0, linewidth=1.5,
-            ax=ax, zorder=1
-        )
-        if show_points == "swarm":
-            sns.swarmplot(
-                data=df, x=group, y=value, order=order,
-                color="black", size=3.5, linewidth=0, zorder=2, ax=ax
+        elif kind == "point":
+            sns.pointplot(
+                data=df, x=group, y=value,
+                estimator="mean", errorbar=point_error,
+                markers="o", linestyles="-",
+                markersize=point_markersize, linewidth=point_linewidth,
+                capsize=0.18, err_kws={"linewidth": 2},
+                ax=ax, zorder=2
             )
-        elif show_points == "strip":
-            sns.stripplot(
-                data=df, x=group, y=value, order=order,
-                color="black", size=3.5, jitter=0.28, alpha=0.85,
-                zorder=2, ax=ax
+        else:
+            raise ValueError("plot_kind must be 'box', 'point', or 'violin'.")
+        if ds_points:
+            _datashader_strip(ax, df, group, value)
+
+        # ---- cosmetics (before annotations: brackets are sized to the final axes) ----
+        if title:
+            ax.set_title(title, fontsize=12, weight="bold", pad=12)
+        ax.set_xlabel("")
+        ax.set_ylabel(ylabel or value, fontsize=10)
+        # tick_params also covers ticks created after y-limits grow for brackets
+        ax.tick_params(axis="x", labelsize=10, labelrotation=15)
+        plt.setp(ax.get_xticklabels(), ha="right")
+        ax.tick_params(axis="y", labelsize=10)
+        sns.despine(ax=ax)
+
+        # ---- significance annotations (inside axes) ----
+        if pairs and Annotator is not None:
+            annot = Annotator(ax, pairs, data=df, x=group, y=value, order=order)
+            annot.configure(
+                test=None,  # we pass p-values directly
+                text_format="star", show_test_name=False,
+                pvalue_thresholds=PVALUE_THRESHOLDS,
+                loc="inside", line_height=0.02, line_offset=0.02
             )
+            annot.set_pvalues_and_annotate(pvalues=pvals)
+        elif pairs:
+            _annotate_pairs(ax, pairs, pvals, order, df.loc[df[group].notna(), value])
+    return fig, ax
 
-    elif kind == "point":
-        sns.pointplot(
-            data=df, x=group, y=value, order=order,
-            estimator="mean", errorbar=point_error,
-            markers="o", linestyles="-",
-            markersize=point_markersize, linewidth=point_linewidth,
-            capsize=0.18, err_kws={"linewidth": 2},
-            ax=ax, zorder=2
-        )
+def _select_pairs(
+    tests: pd.DataFrame,
+    order: list,
+    alpha: float,
+    show_only_significant: bool,
+) -> Tuple[list, list]:
+    """Pairs to annotate, in it.combinations(order, 2) sequence, with their p-values."""
+    # dense upper-triangular p-value matrix, P[i, j] for order[i] < order[j];
+    # categorical codes give positions in order (-1 for other levels)
+    k = len(order)
+    P = np.full((k, k), np.nan)
+    ai = pd.Categorical(tests["A"], categories=order).codes
+    bi = pd.Categorical(tests["B"], categories=order).codes
+    keep = (ai >= 0) & (bi >= 0)
+    ai, bi = ai[keep], bi[keep]
+    P[np.minimum(ai, bi), np.maximum(ai, bi)] = tests["pval"].to_numpy()[keep]
+
+    ii, jj = np.triu_indices(k, 1)  # same sequence as it.combinations
+    pvals = P[ii, jj]
+    if show_only_significant:
+        # only the surviving pairs are materialized as tuples
+        sig = pvals < alpha
+        ii, jj, pvals = ii[sig], jj[sig], pvals[sig]
+        pairs = [(order[i], order[j]) for i, j in zip(ii, jj)]
     else:
-        raise ValueError("plot_kind must be 'box', 'point', or 'violin'.")
-
-    # ---- significance annotations (inside axes) ----
-    if pairs and _HAS_ANNOT:
-        annot = Annotator(ax, pairs, data=df, x=group, y=value, order=order)
-        annot.configure(
-            test=None,  # we pass p-values directly
-            text_format="star", show_test_name=False,
-            pvalue_thresholds=[(1e-4,"****"), (1e-3,"***"), (1e-2,"**"), (5e-2,"*"), (1,"ns")],
-            loc="inside", line_height=0.02, line_offset=0.02
+        pairs = list(it.combinations(order, 2))
+    pvals = pvals.tolist()
+    return pairs, pvals
+
+def _split_by_group(df: pd.DataFrame, group: str, value: str, k: int) -> List[np.ndarray]:
+    """Finite values of `value` per category code 0..k-1, in one O(N) partition."""
+    codes = df[group].cat.codes.to_numpy()
+    vals = df[value].to_numpy(dtype=float)
+    keep = (codes >= 0) & np.isfinite(vals)
+    codes, vals = codes[keep], vals[keep]
+    srt = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[srt], np.arange(1, k))
+    return np.split(vals[srt], bounds)
+
+def _fast_boxplot(ax, by_group, order, show_points, showfliers, rasterize_points):
+    import seaborn as sns
+
+    pos = np.arange(len(order))
+    face = sns.desaturate(sns.color_palette()[0], 0.75)
+    ax.boxplot(
+        by_group, positions=pos, widths=0.5, showfliers=showfliers,
+        patch_artist=True,
+        boxprops=dict(linewidth=2, alpha=0.9, facecolor=face),
+        whiskerprops=dict(linewidth=2), capprops=dict(linewidth=2),
+        medianprops=dict(linewidth=2.2, color="black"),
+        zorder=1,
+    )
+    if show_points in ("swarm", "strip"):
+        # same jitter extent as the seaborn stripplot path
+        rng = np.random.default_rng(0)
+        xs = np.concatenate([i + rng.uniform(-STRIP_JITTER, STRIP_JITTER, g.size)
+                             for i, g in enumerate(by_group)])
+        ax.scatter(
+            xs, np.concatenate(by_group), s=3.5 ** 2, c="black", linewidths=0,
+            alpha=0.85, zorder=2, rasterized=rasterize_points,
         )
-        annot.set_pvalues_and_annotate(pvalues=pvals)
-
-    # ---- cosmetics ----
-    if title:
-        ax.set_title(title, fontsize=12, weight="bold", pad=12)
-    ax.set_xlabel("")
-    ax.set_ylabel(ylabel or value, fontsize=10)
-    plt.xticks(rotation=15, ha="right", fontsize=10)
-    plt.yticks(fontsize=10)
-    sns.despine()
-    if created_ax:
-        plt.tight_layout()
-    return fig, ax
+    ax.set_xticks(pos)
+    ax.set_xticklabels(order)
+    ax.set_xlim(-0.5, len(order) - 0.5)
+    ax.xaxis.grid(False)
+    return ax
+
+def _star(p: float) -> str:
+    for bound, label in PVALUE_THRESHOLDS:
+        if p <= bound:
+            return label
+    return "ns"
+
+def _annotate_pairs(ax, pairs, pvals, order, values: pd.Series, fontsize: float = 12) -> None:
+    """
+    Stacked significance brackets above the data, one ax.plot/ax.text per pair.
+
+    Level spacing is sized in points from the measured label height and
+    converted to data units at the final y-limits of the laid-out axes, so
+    labels clear the bracket above them whatever the data range.
+    """
+    fig = ax.figure
+    # settle the layout first so the axes height below is the drawn one
+    engine = fig.get_layout_engine() if hasattr(fig, "get_layout_engine") else None
+    if engine is not None:
+        engine.execute(fig)
+    renderer = fig.canvas.get_renderer()
+    probe = ax.text(0, 0, "ns*", fontsize=fontsize)
+    text_h = probe.get_window_extent(renderer).height * 72 / fig.dpi
+    probe.remove()
+    axes_h = ax.get_window_extent(renderer).height * 72 / fig.dpi
+
+    # in points: gap above the data, bracket tick, label pad, gap to next level
+    gap0, h, pad, gap = 6.0, 4.0, 1.0, 3.0
+    step = h + pad + text_h + gap
+
+    # shortest spans first; each bracket sits one level above whatever it covers
+    idx = {lvl: i for i, lvl in enumerate(order)}
+    level = np.zeros(len(order), dtype=int)
+    placed = []
+    for (a, b), p in sorted(zip(pairs, pvals), key=lambda t: idx[t[0][1]] - idx[t[0][0]]):
+        i, j = sorted((idx[a], idx[b]))
+        lv = level[i:j + 1].max()
+        level[i:j + 1] = lv + 1
+        placed.append((i, j, lv, p))
+
+    # a stack taller than most of the axes would spill out and be re-laid-out
+    # at draw time; shrink labels and spacing until it fits instead
+    need = gap0 + step * level.max()
+    if axes_h > 0 and need > 0.8 * axes_h:
+        shrink = 0.8 * axes_h / need
+        gap0, h, pad, step, fontsize = (v * shrink for v in (gap0, h, pad, step, fontsize))
+        need *= shrink
+
+    # raise the top so the stack (in points) fits above the data:
+    # (top - ymax) / (top - bottom) == need / axes_h
+    ymax = float(np.nanmax(values))
+    bottom, top = ax.get_ylim()
+    frac = need / axes_h if axes_h > 0 else 0.0
+    top = max(top, (ymax - frac * bottom) / (1 - frac))
+    ax.set_ylim(bottom, top)
+    pt = (top - bottom) / axes_h if axes_h > 0 else 0.0  # data units per point
+
+    for i, j, lv, p in placed:
+        y = ymax + pt * (gap0 + step * lv)
+        ax.plot([i, i, j, j], [y, y + pt * h, y + pt * h, y], lw=1.5, c="k")
+        ax.text((i + j) / 2, y + pt * (h + pad), _star(p), ha="center", va="bottom",
+                fontsize=fontsize)
+
+def _use_datashader(backend: str, n: int) -> bool:
+    if backend == "datashader":
+        return True
+    if backend == "matplotlib" or n <= DATASHADER_MIN:
+        return False
+    return importlib.util.find_spec("datashader") is not None
+
+def _datashader_strip(ax, df: pd.DataFrame, group: str, value: str) -> None:
+    """Jittered strip points shaded by datashader and composited with imshow."""
+    import datashader as ds
+    import datashader.transfer_functions as tf
+
+    codes = df[group].cat.codes.to_numpy()
+    keep = codes >= 0
+    # same jitter extent as the seaborn/fast strip paths
+    rng = np.random.default_rng(0)
+    pts = pd.DataFrame({
+        "x": codes[keep] + rng.uniform(-STRIP_JITTER, STRIP_JITTER, int(keep.sum())),
+        "y": df[value].to_numpy(dtype=float)[keep],
+    })
+
+    # the y-limits so far may only reach the whiskers (box plots hide fliers
+    # under points), so cover the full data range, padded like ax.margins
+    (x0, x1), (y0, y1) = ax.get_xlim(), ax.get_ylim()
+    y = pts["y"].to_numpy()
+    y = y[np.isfinite(y)]
+    if y.size:
+        lo, hi = float(y.min()), float(y.max())
+        pad = ax.margins()[1] * ((hi - lo) or 1.0)
+        y0, y1 = min(y0, lo - pad), max(y1, hi + pad)
+
+    # the canvas is rendered once, before layout and before the output dpi is
+    # known: size it from the axes' current size in inches at DATASHADER_DPI
+    # (the CLI's savefig dpi) and let imshow resample it to the final axes
+    bbox = ax.get_window_extent()
+    scale = DATASHADER_DPI / ax.figure.dpi
+    cvs = ds.Canvas(plot_width=max(int(bbox.width * scale), 1),
+                    plot_height=max(int(bbox.height * scale), 1),
+                    x_range=(x0, x1), y_range=(y0, y1))
+    img = tf.spread(tf.shade(cvs.points(pts, "x", "y"), cmap=["black"], min_alpha=100), px=1)
+    ax.imshow(np.asarray(img.to_pil()), extent=(x0, x1, y0, y1), origin="upper",
+              aspect="auto", interpolation="antialiased", zorder=2)
+    ax.set_xlim(x0, x1)
+    ax.set_ylim(y0, y1)
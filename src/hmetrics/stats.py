@@ -0,0 +1,149 @@
+from __future__ import annotations
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# pingouin and scipy.stats are imported on first use; they dominate import time
+
+# memoized pairwise results, keyed by a fingerprint of the inputs
+_TEST_CACHE: Dict[tuple, pd.DataFrame] = {}
+_TEST_CACHE_MAXSIZE = 32
+
+def clear_pairwise_cache() -> None:
+    """Drop all memoized results of `run_pairwise_tests`."""
+    _TEST_CACHE.clear()
+
+def run_pairwise_tests(
+    df: pd.DataFrame,
+    group: str,
+    value: str,
+    order: Optional[Iterable[str]] = None,
+    nonparametric: bool = True,            # True -> Mann–Whitney; False -> Welch t-test
+    padjust: str = "holm",                 # 'holm','bonferroni','fdr_bh',...
+    n_jobs: int = 1,                       # >1 or -1 -> one test per pair across processes
+) -> pd.DataFrame:
+    """
+    Pairwise tests between groups with multiple-testing correction.
+
+    Results are memoized on a hash of ``df[[group, value]]`` plus the test
+    parameters, so re-plotting the same data with different cosmetics does
+    not recompute the tests. Use `clear_pairwise_cache` to reset.
+
+    Parameters
+    ----------
+    df : DataFrame
+        Must contain columns [group (categorical), value (numeric)] in tidy form.
+    group : str
+        Categorical column name.
+    value : str
+        Numeric column name.
+    order : list[str] | None
+        Levels to compare. If None, alphabetical order of unique levels.
+    nonparametric : bool
+        If True use Mann–Whitney; else Welch's t-test.
+    padjust : str
+        Multiple-testing correction method (pingouin style).
+    n_jobs : int
+        If 1 (default), all pairs are tested in one batched SciPy call.
+        Otherwise pairs are tested independently with joblib across
+        `n_jobs` processes (-1 for all CPUs); worthwhile for many groups
+        with large per-group samples.
+
+    Returns
+    -------
+    DataFrame
+        Columns ``A``, ``B``, ``pair`` (``(A, B)`` normalized so A precedes B
+        in `order`) and ``pval`` (corrected p-value).
+    """
+    if order is None:
+        order = sorted(df[group].dropna().unique().tolist())
+    order = list(order)
+    if len(order) < 2:
+        # nothing to compare
+        return pd.DataFrame(columns=["A", "B", "pair", "pval"])
+
+    key = (
+        df.shape[0],
+        int(pd.util.hash_pandas_object(df[[group, value]], index=False).sum()),
+        group, value, bool(nonparametric), padjust, tuple(order),
+    )
+    cached = _TEST_CACHE.get(key)
+    if cached is None:
+        cached = _pairwise_tests(df, group, value, order, nonparametric, padjust, n_jobs)
+        if len(_TEST_CACHE) >= _TEST_CACHE_MAXSIZE:
+            _TEST_CACHE.pop(next(iter(_TEST_CACHE)))
+        _TEST_CACHE[key] = cached
+    return cached.copy()
+
+def _pairwise_tests(
+    df: pd.DataFrame,
+    group: str,
+    value: str,
+    order: list,
+    nonparametric: bool,
+    padjust: str,
+    n_jobs: int,
+) -> pd.DataFrame:
+    import pingouin as pg
+
+    groups = {lvl: df.loc[df[group] == lvl, value].to_numpy(dtype=float) for lvl in order}
+    vals = [groups[lvl] for lvl in order]
+
+    # all pairs as an (npairs, 2) int array, left<right by order, in
+    # it.combinations sequence; no per-pair Python tuples
+    idx_pairs = np.column_stack(np.triu_indices(len(order), 1))
+    if n_jobs == 1:
+        pvals = _batched_pvals(vals, idx_pairs, nonparametric)
+    else:
+        from joblib import Parallel, delayed
+        vals = [v[~np.isnan(v)] for v in vals]  # NaN only, as nan_policy="omit"
+        pvals = np.asarray(Parallel(n_jobs=n_jobs, backend="loky")(
+            delayed(_one_pair)(vals[i], vals[j], nonparametric) for i, j in idx_pairs
+        ), dtype=float)
+    _, pvals = pg.multicomp(pvals, method=padjust)
+
+    # one take into a (npairs, 2) array of level names; columns are views
+    ap = np.asarray(order, dtype=object)[idx_pairs]
+    A, B = ap[:, 0], ap[:, 1]
+    return pd.DataFrame({
+        "A": A, "B": B,
+        "pair": list(zip(A, B)),
+        "pval": pvals,
+    })
+
+def _batched_pvals(vals: List[np.ndarray], idx_pairs: np.ndarray, nonparametric: bool) -> np.ndarray:
+    from scipy import stats
+
+    # values per level, padded with NaN into one (k, maxlen) block
+    maxlen = max((v.size for v in vals), default=0)
+    G = np.full((len(vals), maxlen), np.nan)
+    for i, v in enumerate(vals):
+        G[i, :v.size] = v
+
+    # one batched call over the pair axis
+    X, Y = G[idx_pairs[:, 0]], G[idx_pairs[:, 1]]
+    if nonparametric:
+        res = stats.mannwhitneyu(X, Y, axis=1, nan_policy="omit", alternative="two-sided")
+    else:
+        res = stats.ttest_ind(X, Y, axis=1, equal_var=False, nan_policy="omit",
+                              alternative="two-sided")
+    pvals = np.atleast_1d(np.asarray(res.pvalue, dtype=float))
+    if not nonparametric:
+        # same rule as pingouin's correction='auto': Welch only for unequal sizes
+        n = (~np.isnan(G)).sum(axis=1)
+        same = n[idx_pairs[:, 0]] == n[idx_pairs[:, 1]]
+        if same.any():
+            res = stats.ttest_ind(X[same], Y[same], axis=1, equal_var=True,
+                                  nan_policy="omit", alternative="two-sided")
+            pvals[same] = res.pvalue
+    return pvals
+
+def _one_pair(x: np.ndarray, y: np.ndarray, nonparametric: bool) -> float:
+    from scipy import stats
+
+    if nonparametric:
+        return float(stats.mannwhitneyu(x, y, alternative="two-sided").pvalue)
+    # same rule as pingouin's correction='auto': Welch only for unequal sizes
+    return float(stats.ttest_ind(x, y, equal_var=(x.size == y.size),
+                                 alternative="two-sided").pvalue)
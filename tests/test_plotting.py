@@ -0,0 +1,101 @@
+import warnings
+
+import matplotlib
+import numpy as np
+import pandas as pd
+import pytest
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+
+from hmetrics import hmetrics_plot  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _close_figures():
+    yield
+    plt.close("all")
+
+
+def test_swarm_max_counts_only_plotted_points():
+    # many rows, but only 20 finite values fall in the two ordered groups
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "group": np.repeat(list("ABC"), [10, 10, 5000]),
+        "value": rng.normal(size=5020),
+    })
+    df.loc[df["group"] == "A", "value"] = np.append(rng.normal(size=5), [np.nan] * 5)
+    with warnings.catch_warnings():
+        warnings.filterwarnings("error", message=".*swarm_max")
+        hmetrics_plot(df, "group", "value", order=["A", "B"], swarm_max=15)
+    with pytest.warns(UserWarning, match="exceed swarm_max"):
+        hmetrics_plot(df, "group", "value", order=["A", "B"], swarm_max=14)
+
+
+def test_fast_swarm_honours_datashader_backend():
+    pytest.importorskip("datashader")
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"group": np.repeat(list("AB"), 500), "value": rng.normal(size=1000)})
+    _, ax = hmetrics_plot(df, "group", "value", show_points="swarm", fast=True,
+                          backend="datashader")
+    assert len(ax.images) == 1
+    assert not any(len(c.get_offsets()) for c in ax.collections)
+
+
+@pytest.mark.parametrize("kind,fast", [("box", False), ("box", True), ("violin", False)])
+def test_datashader_image_covers_data_range(kind, fast):
+    pytest.importorskip("datashader")
+    rng = np.random.default_rng(0)
+    # heavy tails: most points lie far inside the whiskers, a few far outside
+    df = pd.DataFrame({"group": np.repeat(list("AB"), 1500),
+                       "value": rng.standard_t(1.5, size=3000)})
+    _, ax = hmetrics_plot(df, "group", "value", plot_kind=kind, show_points="strip",
+                          fast=fast, backend="datashader")
+    lo, hi = df["value"].min(), df["value"].max()
+    _, _, e0, e1 = ax.images[0].get_extent()
+    assert e0 <= lo and e1 >= hi
+    y0, y1 = ax.get_ylim()
+    assert y0 <= lo and y1 >= hi
+
+
+def _bracket_boxes(ax):
+    """Display-space bboxes of the [i, i, j, j] significance brackets."""
+    from matplotlib.transforms import Bbox
+
+    boxes = []
+    for line in ax.lines:
+        x, y = np.asarray(line.get_xdata(), float), np.asarray(line.get_ydata(), float)
+        if (len(x) == 4 and x[0] == x[1] != x[2] == x[3]
+                and y[0] == y[3] and y[1] == y[2]):
+            xy = line.get_transform().transform(np.column_stack([x, y]))
+            boxes.append(Bbox.from_extents(*xy.min(axis=0), *xy.max(axis=0)))
+    return boxes
+
+
+@pytest.mark.parametrize("kind,k", [("box", 3), ("box", 5), ("box", 6), ("point", 6),
+                                    ("violin", 8)])
+def test_bracket_labels_do_not_overlap_brackets(kind, k):
+    rng = np.random.default_rng(k)
+    df = pd.DataFrame({
+        "group": np.repeat([f"g{i}" for i in range(k)], 30),
+        "value": rng.normal(size=30 * k) + np.repeat(np.arange(k) * 0.5, 30),
+    })
+    fig, ax = hmetrics_plot(df, "group", "value", plot_kind=kind, show_points=None,
+                            title="title")
+    fig.canvas.draw()
+    renderer = fig.canvas.get_renderer()
+    brackets = _bracket_boxes(ax)
+    labels = [t.get_window_extent(renderer) for t in ax.texts]
+    assert len(brackets) == len(labels) == k * (k - 1) // 2
+    # each label clears its own bracket (1pt pad) and every bracket above it
+    assert not any(t.overlaps(b) for t in labels for b in brackets)
+    assert all(t.y1 <= ax.bbox.y1 for t in labels)
+
+
+def test_external_axes_are_despined():
+    df = pd.DataFrame({"group": list("AAABBB"), "value": [1, 2, 3, 4, 5, 6.0]})
+    fig1, ax1 = plt.subplots()
+    fig2, ax2 = plt.subplots()  # current figure
+    hmetrics_plot(df, "group", "value", ax=ax1)
+    assert not ax1.spines["top"].get_visible()
+    assert ax2.spines["top"].get_visible()
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pingouin as pg
+import pytest
+
+from hmetrics import clear_pairwise_cache, run_pairwise_tests
+
+
+@pytest.fixture
+def df():
+    # unequal group sizes (Welch for most pairs, Student for C/D) plus a NaN
+    rng = np.random.default_rng(1)
+    sizes = [5, 12, 20, 20, 30]
+    d = pd.DataFrame({
+        "group": np.repeat(list("ABCDE"), sizes),
+        "value": rng.normal(size=sum(sizes)) * np.repeat([1, 2, 1, 3, 1], sizes),
+    })
+    d.loc[3, "value"] = np.nan
+    return d
+
+
+def _pingouin_pvals(df, nonparametric, padjust):
+    t = pg.pairwise_tests(data=df, dv="value", between="group",
+                          parametric=not nonparametric, padjust=padjust)
+    for col in ("p-corr", "p_corr", "p-unc", "p_unc"):
+        if col in t.columns:
+            return list(zip(t["A"], t["B"])), t[col].to_numpy(dtype=float)
+    raise KeyError("no p-value column in pingouin output")
+
+
+@pytest.mark.parametrize("nonparametric", [True, False])
+@pytest.mark.parametrize("padjust", ["holm", "bonf", "fdr_bh", "none"])
+def test_matches_pingouin(df, nonparametric, padjust):
+    clear_pairwise_cache()
+    out = run_pairwise_tests(df, "group", "value",
+                             nonparametric=nonparametric, padjust=padjust)
+    pairs, expected = _pingouin_pvals(df, nonparametric, padjust)
+    assert list(out["pair"]) == pairs
+    np.testing.assert_allclose(out["pval"].to_numpy(dtype=float), expected)
+
+
+@pytest.mark.parametrize("nonparametric", [True, False])
+def test_joblib_path_matches_batched(df, nonparametric):
+    df.loc[10, "value"] = np.inf  # kept by both paths, like NaN is dropped by both
+    clear_pairwise_cache()
+    batched = run_pairwise_tests(df, "group", "value", nonparametric=nonparametric)
+    clear_pairwise_cache()
+    parallel = run_pairwise_tests(df, "group", "value", nonparametric=nonparametric, n_jobs=2)
+    np.testing.assert_allclose(parallel["pval"].to_numpy(dtype=float),
+                               batched["pval"].to_numpy(dtype=float), equal_nan=True)
+
+
+def test_single_level_is_empty():
+    d = pd.DataFrame({"group": ["A"] * 5, "value": np.arange(5.0)})
+    out = run_pairwise_tests(d, "group", "value")
+    assert out.empty
+    assert list(out.columns) == ["A", "B", "pair", "pval"]